@@ -1,21 +1,35 @@
 import os
 import sys
+import json
+import uuid
+import pickle
+import shutil
 import logging
+import platform
 import argparse
-from typing import List, Dict, Any, Optional, Tuple
+from array import array
+from functools import lru_cache
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple, Iterable, Iterator
 
 import numpy as np
-import pandas as pd
-from tqdm import tqdm
-import torch
-from PyPDF2 import PdfReader
+import faiss
+from numba import njit
+import pypdfium2 as pdfium
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_community.vectorstores import FAISS
+from langchain_community.vectorstores.utils import DistanceStrategy
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain.docstore.document import Document
 from langchain_community.embeddings import HuggingFaceEmbeddings
+from langchain.embeddings.base import Embeddings
+from langchain.embeddings import CacheBackedEmbeddings
+from langchain.storage import LocalFileStore
 from langchain.chains.question_answering import load_qa_chain
 from langchain.memory import ConversationBufferMemory
 from langchain_community.llms import HuggingFaceHub
-from langchain.callbacks import get_openai_callback
+from langchain.callbacks import get_openai_callback, OpenAICallbackHandler
 
 # Configure logging
 logging.basicConfig(
@@ -25,6 +39,522 @@ logging.basicConfig(
 )
 logger = logging.getLogger("ResearchAgent")
 
+def _device() -> str:
+    """
+    Pick the torch device for the embedding model.
+    
+    torch is imported here rather than at module load so that code paths
+    which never touch the model don't pay for it.
+    
+    Returns:
+        "cuda" if a CUDA GPU is available, otherwise "cpu"
+    """
+    import torch
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+def _configure_cpu_threads(num_threads: Optional[int] = None) -> None:
+    """
+    Configure torch and BLAS thread pools for CPU inference.
+    
+    Some environments leave torch with a single intra-op thread, which makes
+    CPU embedding many times slower than it needs to be. This only affects
+    CPU inference; GPU kernels ignore these settings.
+    
+    An explicit `OMP_NUM_THREADS` in the environment is respected: when
+    `num_threads` is not given, torch keeps the thread count it read from it.
+    
+    Args:
+        num_threads: Intra-op thread count; defaults to OMP_NUM_THREADS if
+            set, otherwise the usable CPU count
+    """
+    # torch already honours a deployer's OMP_NUM_THREADS; don't override it
+    respect_env = num_threads is None and "OMP_NUM_THREADS" in os.environ
+    
+    if num_threads is None:
+        if hasattr(os, "sched_getaffinity"):
+            num_threads = len(os.sched_getaffinity(0))
+        else:
+            num_threads = os.cpu_count() or 1
+    
+    # BLAS libraries read these when torch is first imported
+    os.environ.setdefault("OMP_NUM_THREADS", str(num_threads))
+    os.environ.setdefault("MKL_NUM_THREADS", str(num_threads))
+    
+    import torch
+    if not respect_env:
+        torch.set_num_threads(num_threads)
+    try:
+        torch.set_num_interop_threads(2)
+    except RuntimeError:
+        # Can only be set once, before any inter-op work has started
+        pass
+
+# Default on-disk cache for chunk embeddings
+_EMBEDDING_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "embeddings")
+
+# Below this many pages, starting worker processes costs more than it saves
+_MIN_PAGES_FOR_POOL = 8
+
+# PDF document opened once per worker process
+_worker_pdf = None
+
+def _init_pdf_worker(pdf_path: str) -> None:
+    """
+    Open the PDF once in each worker process.
+    
+    Args:
+        pdf_path: Path to the PDF file
+    """
+    global _worker_pdf
+    _worker_pdf = pdfium.PdfDocument(pdf_path)
+
+def _page_text(pdf: pdfium.PdfDocument, page_idx: int) -> str:
+    """
+    Extract the text of a single PDF page.
+    
+    Args:
+        pdf: Open PDF document
+        page_idx: Zero-based page index
+        
+    Returns:
+        Extracted page text
+    """
+    page = pdf[page_idx]
+    textpage = page.get_textpage()
+    try:
+        return textpage.get_text_range() or ""
+    finally:
+        textpage.close()
+        page.close()
+
+def _extract_page(page_idx: int) -> str:
+    """
+    Extract the text of a single PDF page in a worker process.
+    
+    Args:
+        page_idx: Zero-based page index
+        
+    Returns:
+        Extracted page text
+    """
+    return _page_text(_worker_pdf, page_idx)
+
+def _extract_pages_serial(pdf_path: str, num_pages: int) -> Iterator[str]:
+    """
+    Extract the text of each PDF page in the current process.
+    
+    Args:
+        pdf_path: Path to the PDF file
+        num_pages: Number of pages in the PDF
+        
+    Yields:
+        Extracted page text, in page order
+    """
+    pdf = pdfium.PdfDocument(pdf_path)
+    try:
+        for page_idx in range(num_pages):
+            yield _page_text(pdf, page_idx)
+    finally:
+        pdf.close()
+
+def _extract_pages_parallel(
+    executor: ProcessPoolExecutor,
+    num_pages: int,
+    max_in_flight: int
+) -> Iterator[str]:
+    """
+    Extract the text of each PDF page in worker processes.
+    
+    At most `max_in_flight` pages are submitted at a time, and the next page
+    is submitted as each result is yielded, so finished pages never pile up
+    ahead of a slower consumer.
+    
+    Args:
+        executor: Pool whose workers were initialized with `_init_pdf_worker`
+        num_pages: Number of pages in the PDF
+        max_in_flight: Maximum number of pages submitted but not yet yielded
+        
+    Yields:
+        Extracted page text, in page order
+    """
+    futures = deque()
+    next_page = 0
+    try:
+        while next_page < num_pages or futures:
+            while next_page < num_pages and len(futures) < max_in_flight:
+                futures.append(executor.submit(_extract_page, next_page))
+                next_page += 1
+            yield futures.popleft().result()
+    finally:
+        for future in futures:
+            future.cancel()
+
+@njit(cache=True)
+def _chunk_offsets(buf: np.ndarray, size: int, overlap: int, window: int) -> np.ndarray:
+    """
+    Compute (start, end) byte offsets of fixed-size overlapping chunks.
+    
+    Chunk ends are snapped back to the nearest whitespace within `window`
+    bytes, and starts forward past it, so words are not cut in half. Offsets
+    never fall inside a UTF-8 multi-byte sequence.
+    
+    Args:
+        buf: UTF-8 encoded text as a uint8 array
+        size: Maximum chunk size in bytes
+        overlap: Overlap between consecutive chunks in bytes
+        window: How far to look for whitespace when snapping
+        
+    Returns:
+        Array of shape (num_chunks, 2)
+    """
+    n = buf.shape[0]
+    out = np.empty((n // max(size - overlap, 1) + 2, 2), dtype=np.int64)
+    count = 0
+    start = 0
+    
+    while start < n:
+        end = min(start + size, n)
+        
+        if end < n:
+            # Snap end back to whitespace
+            j = end
+            lo = max(end - window, start + 1)
+            while j > lo and buf[j] > 32:
+                j -= 1
+            if buf[j] <= 32:
+                end = j
+            # Never cut a multi-byte character
+            while end > start + 1 and (buf[end] & 0xC0) == 0x80:
+                end -= 1
+        
+        if count == out.shape[0]:
+            grown = np.empty((out.shape[0] * 2, 2), dtype=np.int64)
+            grown[:count] = out[:count]
+            out = grown
+        out[count, 0] = start
+        out[count, 1] = end
+        count += 1
+        
+        if end >= n:
+            break
+        
+        # Step back by the overlap, then snap start forward past whitespace
+        next_start = max(end - overlap, start + 1)
+        hi = min(next_start + window, end)
+        j = next_start
+        while j < hi and buf[j] > 32:
+            j += 1
+        if j < hi and next_start > 0 and buf[next_start - 1] > 32:
+            next_start = j + 1
+        while next_start < end and (buf[next_start] & 0xC0) == 0x80:
+            next_start += 1
+        start = next_start
+    
+    return out[:count]
+
+@njit(cache=True)
+def _normalize_ws(buf: np.ndarray, out: np.ndarray) -> int:
+    """
+    Collapse whitespace runs in UTF-8 text.
+    
+    Bytes <= 0x20 count as whitespace. A run becomes a blank line if it holds
+    two or more newlines, a newline if it holds one, and a space otherwise;
+    leading and trailing runs are dropped. Aligned 8-byte words without any
+    whitespace are detected with a SWAR compare and copied in one step.
+    
+    Args:
+        buf: UTF-8 encoded text as a uint8 array
+        out: Output buffer with room for at least len(buf) bytes
+        
+    Returns:
+        Length of the normalized text written to `out`
+    """
+    n = buf.shape[0]
+    words = buf[:n - n % 8].view(np.uint64)
+    ones = np.uint64(0x2121212121212121)
+    highs = np.uint64(0x8080808080808080)
+    
+    o = 0
+    i = 0
+    in_ws = False
+    newlines = 0
+    
+    while i < n:
+        if not in_ws and i % 8 == 0 and i + 8 <= n:
+            x = words[i // 8]
+            # No byte in the word is <= 0x20
+            if ((x - ones) & ~x & highs) == 0:
+                out[o:o + 8] = buf[i:i + 8]
+                o += 8
+                i += 8
+                continue
+        
+        b = buf[i]
+        if b <= 32:
+            if b == 10:
+                newlines += 1
+            in_ws = True
+        else:
+            if in_ws and o > 0:
+                if newlines >= 2:
+                    out[o] = 10
+                    out[o + 1] = 10
+                    o += 2
+                elif newlines == 1:
+                    out[o] = 10
+                    o += 1
+                else:
+                    out[o] = 32
+                    o += 1
+            in_ws = False
+            newlines = 0
+            out[o] = b
+            o += 1
+        i += 1
+    
+    return o
+
+class ONNXEmbeddings(Embeddings):
+    """
+    Sentence-transformer embeddings served by ONNX Runtime.
+    
+    The model is exported to ONNX on first use and cached on disk; later runs
+    load the cached graph directly. Inputs are truncated at the model's
+    sentence-transformers `max_seq_length`, and outputs are mean-pooled and
+    L2-normalized, to match the sentence-transformers pipeline.
+    
+    Requires the optional `optimum[onnxruntime]` extra; CUDA inference
+    additionally needs `onnxruntime-gpu` in place of `onnxruntime`.
+    """
+    
+    def __init__(
+        self,
+        model_name: str,
+        cache_dir: Optional[str] = None,
+        batch_size: int = 64,
+    ):
+        try:
+            import onnxruntime
+            from optimum.onnxruntime import ORTModelForFeatureExtraction
+        except ImportError as e:
+            raise ImportError(
+                "The ONNX embedding backend requires optimum and onnxruntime: "
+                "pip install 'optimum[onnxruntime]' (or optimum and "
+                "onnxruntime-gpu for CUDA)"
+            ) from e
+        from transformers import AutoTokenizer
+        
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.cache_dir = cache_dir or os.path.join(
+            os.path.expanduser("~"), ".cache", "onnx", model_name.replace("/", "--")
+        )
+        
+        if "CUDAExecutionProvider" in onnxruntime.get_available_providers():
+            provider = "CUDAExecutionProvider"
+        else:
+            provider = "CPUExecutionProvider"
+        
+        # Load cached export if present, otherwise export and cache it
+        if os.path.exists(os.path.join(self.cache_dir, "model.onnx")):
+            self.model = ORTModelForFeatureExtraction.from_pretrained(
+                self.cache_dir, provider=provider
+            )
+            self.tokenizer = AutoTokenizer.from_pretrained(self.cache_dir)
+        else:
+            logger.info(f"Exporting {model_name} to ONNX: {self.cache_dir}")
+            self.model = ORTModelForFeatureExtraction.from_pretrained(
+                model_name, export=True, provider=provider
+            )
+            self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+            self.model.save_pretrained(self.cache_dir)
+            self.tokenizer.save_pretrained(self.cache_dir)
+        
+        self.max_seq_length = self._load_max_seq_length()
+    
+    def _load_max_seq_length(self) -> int:
+        """
+        Read the truncation length from the sentence-transformers config.
+        
+        The config is copied next to the cached export on first use. Models
+        without one fall back to the tokenizer's maximum length.
+        
+        Returns:
+            Maximum number of tokens per input
+        """
+        config_path = os.path.join(self.cache_dir, "sentence_bert_config.json")
+        
+        if not os.path.exists(config_path):
+            try:
+                if os.path.isdir(self.model_name):
+                    source = os.path.join(self.model_name, "sentence_bert_config.json")
+                else:
+                    from huggingface_hub import hf_hub_download
+                    source = hf_hub_download(self.model_name, "sentence_bert_config.json")
+                shutil.copyfile(source, config_path)
+            except OSError:
+                logger.warning(
+                    f"No sentence-transformers config for {self.model_name}, "
+                    "truncating at the tokenizer maximum length"
+                )
+                return self.tokenizer.model_max_length
+        
+        with open(config_path, "r", encoding="utf-8") as f:
+            max_seq_length = json.load(f).get("max_seq_length")
+        return min(max_seq_length or self.tokenizer.model_max_length,
+                   self.tokenizer.model_max_length)
+    
+    def encode(self, texts: List[str], batch_size: Optional[int] = None) -> np.ndarray:
+        """
+        Embed texts in batches.
+        
+        Args:
+            texts: Texts to embed
+            batch_size: Batch size; defaults to the instance batch size
+            
+        Returns:
+            Array of L2-normalized embeddings of shape (len(texts), dim)
+        """
+        batch_size = batch_size or self.batch_size
+        batches = []
+        
+        for start in range(0, len(texts), batch_size):
+            inputs = self.tokenizer(
+                texts[start:start + batch_size],
+                padding=True,
+                truncation=True,
+                max_length=self.max_seq_length,
+                return_tensors="np"
+            )
+            hidden = self.model(**inputs).last_hidden_state
+            
+            # Mean pooling over non-padding tokens
+            mask = inputs["attention_mask"][..., None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+            batches.append(pooled.astype(np.float32))
+        
+        if not batches:
+            return np.empty((0, self.model.config.hidden_size), dtype=np.float32)
+        return np.vstack(batches)
+    
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed documents.
+        
+        Args:
+            texts: Texts to embed
+            
+        Returns:
+            List of embeddings, one per text
+        """
+        return self.encode(texts).tolist()
+    
+    def embed_query(self, text: str) -> List[float]:
+        """
+        Embed a query.
+        
+        Args:
+            text: Query text
+            
+        Returns:
+            Query embedding
+        """
+        return self.encode([text])[0].tolist()
+
+class SemanticCache:
+    """
+    Cache of answers keyed by question embedding.
+    
+    A question whose cosine similarity to a cached question reaches the
+    threshold, asked with the same retrieval parameters, is served the cached
+    answer without calling the LLM. Entries are evicted least-recently-used
+    once the cache is full.
+    """
+    
+    # Number of nearest cached questions checked for matching parameters
+    _CANDIDATES = 8
+    
+    def __init__(self, threshold: float = 0.95, max_entries: int = 10000):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.index = None
+        self.entries = OrderedDict()
+        self._next_id = 0
+    
+    @staticmethod
+    def _normalize(embedding: List[float]) -> np.ndarray:
+        vector = np.array([embedding], dtype=np.float32)
+        faiss.normalize_L2(vector)
+        return vector
+    
+    def lookup(
+        self,
+        embedding: List[float],
+        params: Tuple[Any, ...]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Find the cached result for the most similar question.
+        
+        Args:
+            embedding: Question embedding
+            params: Retrieval parameters the answer must have been built with
+            
+        Returns:
+            Cached result, or None if no cached question is similar enough
+        """
+        if not self.entries:
+            return None
+        
+        k = min(self._CANDIDATES, len(self.entries))
+        scores, ids = self.index.search(self._normalize(embedding), k)
+        
+        for score, entry_id in zip(scores[0], ids[0]):
+            if entry_id < 0 or score < self.threshold:
+                break
+            entry_id = int(entry_id)
+            if self.entries[entry_id][1] == params:
+                self.entries.move_to_end(entry_id)
+                return self.entries[entry_id][2]
+        return None
+    
+    def add(
+        self,
+        embedding: List[float],
+        question: str,
+        params: Tuple[Any, ...],
+        result: Dict[str, Any]
+    ) -> None:
+        """
+        Add a question and its result to the cache.
+        
+        Args:
+            embedding: Question embedding
+            question: The question text
+            params: Retrieval parameters the answer was built with
+            result: Result returned for the question
+        """
+        vector = self._normalize(embedding)
+        if self.index is None:
+            self.index = faiss.IndexIDMap2(faiss.IndexFlatIP(vector.shape[1]))
+        
+        # Evict least recently used entries
+        while len(self.entries) >= self.max_entries:
+            evicted_id, _ = self.entries.popitem(last=False)
+            self.index.remove_ids(np.array([evicted_id], dtype=np.int64))
+        
+        entry_id = self._next_id
+        self._next_id += 1
+        self.index.add_with_ids(vector, np.array([entry_id], dtype=np.int64))
+        self.entries[entry_id] = (question, params, result)
+    
+    def clear(self) -> None:
+        """
+        Remove all cached entries.
+        """
+        self.index = None
+        self.entries.clear()
+
 class ResearchAgent:
     """
     Research Agent that can extract information from documents and answer questions.
@@ -44,17 +574,89 @@ class ResearchAgent:
         chunk_overlap: int = 200,
         temperature: float = 0.1,
         vector_db_path: Optional[str] = None,
+        fast_chunking: bool = True,
+        normalize_whitespace: bool = True,
+        batch_size: int = 64,
+        hnsw_m: int = 32,
+        ef_construction: int = 200,
+        use_gpu_index: bool = False,
+        dedup_threshold: Optional[float] = 0.95,
+        use_onnx: bool = False,
+        fp16: bool = True,
+        compile_model: bool = False,
+        num_threads: Optional[int] = None,
+        embedding_cache_dir: Optional[str] = _EMBEDDING_CACHE_DIR,
+        query_cache_size: int = 1024,
+        semantic_cache_threshold: float = 0.95,
+        semantic_cache_size: int = 10000,
     ):
+        if chunk_overlap >= chunk_size:
+            raise ValueError(
+                f"chunk_overlap ({chunk_overlap}) must be smaller than "
+                f"chunk_size ({chunk_size})"
+            )
+        
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
         self.temperature = temperature
         self.vector_db_path = vector_db_path
-        self.documents = []
+        self.fast_chunking = fast_chunking
+        self.normalize_whitespace = normalize_whitespace
+        self.batch_size = batch_size
+        self.hnsw_m = hnsw_m
+        self.ef_construction = ef_construction
+        self.use_gpu_index = use_gpu_index
+        self.dedup_threshold = dedup_threshold
+        self._gpu_resources = None
+        # Processed chunks, stored as parallel arrays
+        self._contents = []
+        self._sources = []
+        self._chunk_ids = array("i")
+        self._pages = array("i")
+        self._ws_buffer = bytearray()
         self.document_metadata = {}
         
         # Initialize embeddings model
         logger.info(f"Initializing embedding model: {embedding_model_name}")
-        self.embeddings = HuggingFaceEmbeddings(model_name=embedding_model_name)
+        if use_onnx:
+            self.embeddings = ONNXEmbeddings(
+                model_name=embedding_model_name,
+                batch_size=batch_size
+            )
+        else:
+            _configure_cpu_threads(num_threads)
+            self.embeddings = HuggingFaceEmbeddings(
+                model_name=embedding_model_name,
+                encode_kwargs={"normalize_embeddings": True}
+            )
+            
+            # Run the embedding model in half precision on GPU
+            if fp16 and _device() == "cuda":
+                logger.info("Using FP16 embedding inference on GPU")
+                self.embeddings.client.half()
+            
+            # Capture the transformer graph with torch.compile
+            if compile_model:
+                self._compile_embedding_model()
+        
+        # Cache document embeddings on disk keyed by chunk content; backends
+        # produce slightly different vectors, so each gets its own namespace
+        self.embedding_cache = None
+        if embedding_cache_dir:
+            self.embedding_cache = CacheBackedEmbeddings.from_bytes_store(
+                self.embeddings,
+                LocalFileStore(embedding_cache_dir),
+                namespace=f"{embedding_model_name}:{'onnx' if use_onnx else 'torch'}"
+            )
+        
+        # Cache query embeddings in memory
+        self._embed_query = lru_cache(maxsize=query_cache_size)(self.embeddings.embed_query)
+        
+        # Cache answers for semantically similar questions
+        self.answer_cache = SemanticCache(
+            threshold=semantic_cache_threshold,
+            max_entries=semantic_cache_size
+        )
         
         # Initialize language model
         logger.info(f"Initializing language model: {llm_model_name}")
@@ -81,10 +683,44 @@ class ResearchAgent:
         
         logger.info("Research Agent initialized successfully")
     
+    def _compile_embedding_model(self) -> None:
+        """
+        Compile the sentence-transformer with torch.compile.
+        
+        The model is warmed up with a dummy forward pass so compilation cost
+        is paid here rather than on the first query. Falls back to eager mode
+        on torch < 2.0 or if compilation fails.
+        """
+        import torch
+        
+        if not hasattr(torch, "compile"):
+            logger.warning("torch.compile requires torch >= 2.0, using eager mode")
+            return
+        
+        transformer = self.embeddings.client[0]
+        eager_model = transformer.auto_model
+        transformer.auto_model = torch.compile(
+            eager_model,
+            mode="reduce-overhead",
+            fullgraph=True,
+            dynamic=True
+        )
+        
+        try:
+            self.embeddings.client.encode(["warm up"], convert_to_numpy=True)
+            logger.info("Embedding model compiled with torch.compile")
+        except Exception as e:
+            logger.warning(f"torch.compile failed, using eager mode: {e}")
+            transformer.auto_model = eager_model
+    
     def process_pdf(self, pdf_path: str) -> None:
         """
         Extract text from a PDF file and add to documents.
         
+        Pages are streamed into the chunk store as they are extracted. If any
+        page fails, chunks already added from this file are removed again, so
+        nothing from a failed PDF is kept.
+        
         Args:
             pdf_path: Path to the PDF file
         """
@@ -94,29 +730,59 @@ class ResearchAgent:
             logger.error(f"PDF file not found: {pdf_path}")
             raise FileNotFoundError(f"PDF file not found: {pdf_path}")
         
+        # Chunk count before this file, for rolling back on failure
+        num_existing = len(self._contents)
+        
         try:
-            pdf_reader = PdfReader(pdf_path)
-            text = ""
+            pdf = pdfium.PdfDocument(pdf_path)
+            num_pages = len(pdf)
+            pdf.close()
+            
+            file_name = os.path.basename(pdf_path)
             
-            # Extract text from each page
-            for page in tqdm(pdf_reader.pages, desc="Extracting PDF text"):
-                text += page.extract_text()
+            from tqdm import tqdm
+            
+            max_workers = min(num_pages, os.cpu_count() or 1)
+            
+            if num_pages < _MIN_PAGES_FOR_POOL or max_workers == 1:
+                # Small PDFs are extracted in-process
+                pages = tqdm(
+                    _extract_pages_serial(pdf_path, num_pages),
+                    total=num_pages,
+                    desc="Extracting PDF text"
+                )
+                self._split_and_add_text(enumerate(pages), source=file_name)
+            else:
+                # Extract pages in parallel and stream them into the splitter
+                with ProcessPoolExecutor(
+                    max_workers=max_workers,
+                    initializer=_init_pdf_worker,
+                    initargs=(pdf_path,)
+                ) as executor:
+                    pages = tqdm(
+                        _extract_pages_parallel(executor, num_pages, 2 * max_workers),
+                        total=num_pages,
+                        desc="Extracting PDF text"
+                    )
+                    self._split_and_add_text(enumerate(pages), source=file_name)
             
             # Store document metadata
-            file_name = os.path.basename(pdf_path)
             self.document_metadata[file_name] = {
                 "path": pdf_path,
                 "type": "pdf",
-                "pages": len(pdf_reader.pages)
+                "pages": num_pages
             }
             
-            # Split text into chunks
-            self._split_and_add_text(text, source=file_name)
-            
             logger.info(f"Successfully processed PDF: {file_name}")
             
         except Exception as e:
             logger.error(f"Error processing PDF: {e}")
+            
+            # Drop chunks added from the partially processed file
+            del self._contents[num_existing:]
+            del self._sources[num_existing:]
+            del self._chunk_ids[num_existing:]
+            del self._pages[num_existing:]
             raise
     
     def process_text_file(self, text_path: str) -> None:
@@ -144,7 +810,7 @@ class ResearchAgent:
             }
             
             # Split text into chunks
-            self._split_and_add_text(text, source=file_name)
+            self._split_and_add_text([(None, text)], source=file_name)
             
             logger.info(f"Successfully processed text file: {file_name}")
             
@@ -152,58 +818,407 @@ class ResearchAgent:
             logger.error(f"Error processing text file: {e}")
             raise
     
-    def _split_and_add_text(self, text: str, source: str) -> None:
+    def _split_and_add_text(
+        self,
+        pages: Iterable[Tuple[Optional[int], str]],
+        source: str
+    ) -> None:
         """
-        Split text into chunks and add to documents list.
+        Split a stream of page texts into chunks and add them to the chunk store.
+        
+        Pages are split one at a time so the full document text is never held
+        in memory. Up to the last `chunk_overlap` characters of each page,
+        starting at a word boundary, are carried into the next one to preserve
+        overlap across page boundaries. Pages without text are skipped.
         
         Args:
-            text: Text to split
+            pages: Iterable of (page index, text) pairs; index is None for
+                unpaginated sources
             source: Source identifier (filename)
         """
         # Create text splitter
-        text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=self.chunk_size,
-            chunk_overlap=self.chunk_overlap,
-            length_function=len
+        if self.fast_chunking:
+            split_text = self._fixed_size_split
+        else:
+            split_text = RecursiveCharacterTextSplitter(
+                chunk_size=self.chunk_size,
+                chunk_overlap=self.chunk_overlap,
+                length_function=len
+            ).split_text
+        
+        tail = ""
+        num_chunks = 0
+        
+        # One shared string for all chunks of this source
+        source = sys.intern(source)
+        page = -1
+        
+        for page_idx, text in pages:
+            # Pages without a text layer yield no text
+            text = text or ""
+            
+            if self.normalize_whitespace:
+                text = self._collapse_whitespace(text)
+            
+            # Skip blank pages, carrying the previous tail over unchanged
+            if not text.strip():
+                continue
+            
+            # Split page text (with carried-over tail) into chunks
+            chunks = split_text(tail + "\n" + text if tail else text)
+            
+            # Append chunks to the parallel arrays (-1 marks no page)
+            if page_idx is not None:
+                page = page_idx
+            self._contents.extend(chunks)
+            self._sources.extend([source] * len(chunks))
+            self._chunk_ids.extend(range(num_chunks, num_chunks + len(chunks)))
+            self._pages.extend([page] * len(chunks))
+            num_chunks += len(chunks)
+            
+            tail = self._overlap_tail(text)
+        
+        logger.info(f"Added {num_chunks} chunks from {source}")
+    
+    def _overlap_tail(self, text: str) -> str:
+        """
+        Get the end of a page to carry into the next one.
+        
+        The tail is at most `chunk_overlap` characters and starts after the
+        first whitespace in that window, so it doesn't begin mid-word.
+        
+        Args:
+            text: Page text
+            
+        Returns:
+            Tail text, or "" if overlap is disabled
+        """
+        if not self.chunk_overlap:
+            return ""
+        
+        start = max(len(text) - self.chunk_overlap, 0)
+        if start > 0 and not text[start - 1].isspace():
+            # Advance past the partial word, if the window has a boundary
+            for i in range(start, len(text)):
+                if text[i].isspace():
+                    start = i + 1
+                    break
+        return text[start:]
+    
+    def _collapse_whitespace(self, text: str) -> str:
+        """
+        Collapse runs of whitespace so they don't count against chunk size.
+        
+        Args:
+            text: Text to normalize
+            
+        Returns:
+            Normalized text
+        """
+        data = text.encode("utf-8")
+        
+        # Reuse one output buffer across pages, growing it only when needed
+        if len(self._ws_buffer) < len(data):
+            self._ws_buffer = bytearray(max(len(data), 2 * len(self._ws_buffer)))
+        
+        length = _normalize_ws(
+            np.frombuffer(data, dtype=np.uint8),
+            np.frombuffer(self._ws_buffer, dtype=np.uint8)
         )
+        return str(memoryview(self._ws_buffer)[:length], "utf-8")
+    
+    def _fixed_size_split(self, text: str) -> List[str]:
+        """
+        Split text into fixed-size overlapping chunks.
         
-        # Split text into chunks
-        chunks = text_splitter.split_text(text)
+        Sizes are measured in UTF-8 bytes, which equals characters for ASCII
+        text. The tail carried across pages by `_split_and_add_text` is still
+        measured in characters, so for non-ASCII text the overlap at a page
+        boundary can be larger in bytes than within a page.
         
-        # Add chunks to documents list with metadata
-        for i, chunk in enumerate(chunks):
-            self.documents.append({
-                "content": chunk,
-                "metadata": {
-                    "source": source,
-                    "chunk": i
-                }
-            })
+        Args:
+            text: Text to split
+            
+        Returns:
+            List of non-empty chunks
+        """
+        data = text.encode("utf-8")
+        offsets = _chunk_offsets(
+            np.frombuffer(data, dtype=np.uint8),
+            self.chunk_size,
+            self.chunk_overlap,
+            64
+        )
+        view = memoryview(data)
+        chunks = (str(view[start:end], "utf-8").strip() for start, end in offsets)
+        return [chunk for chunk in chunks if chunk]
+    
+    def _chunk_metadatas(self) -> List[Dict[str, Any]]:
+        """
+        Build metadata dictionaries for all processed chunks.
+        
+        Returns:
+            List of metadata dictionaries, one per chunk
+        """
+        metadatas = []
+        for source, chunk_id, page in zip(self._sources, self._chunk_ids, self._pages):
+            metadata = {"source": source, "chunk": chunk_id}
+            if page >= 0:
+                metadata["page"] = page
+            metadatas.append(metadata)
+        return metadatas
+    
+    def _embed_texts(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed texts, reusing cached vectors for previously seen chunks.
+        
+        Args:
+            texts: Texts to embed
+            
+        Returns:
+            Array of shape (len(texts), dim) in the original order
+        """
+        if not self.embedding_cache:
+            return self._encode_texts(texts)
+        
+        store = self.embedding_cache.document_embedding_store
+        vectors = store.mget(texts)
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        
+        if missing:
+            logger.info(f"Embedding {len(missing)} of {len(texts)} chunks (rest cached)")
+            missing_texts = [texts[i] for i in missing]
+            computed = self._encode_texts(missing_texts)
+            store.mset(list(zip(missing_texts, computed.tolist())))
+            for i, vector in zip(missing, computed):
+                vectors[i] = vector
+        
+        return np.asarray(vectors, dtype=np.float32)
+    
+    def _encode_texts(self, texts: List[str]) -> np.ndarray:
+        """
+        Encode texts in mini-batches of similar length.
+        
+        Sorting by length keeps the padding inside each batch small, so the
+        transformer spends its FLOPs on real tokens.
+        
+        Args:
+            texts: Texts to encode
+            
+        Returns:
+            Array of shape (len(texts), dim) in the original order
+        """
+        order = np.argsort([len(t) for t in texts], kind="stable")
+        sorted_texts = [texts[i] for i in order]
+        
+        if isinstance(self.embeddings, ONNXEmbeddings):
+            sorted_embeddings = self.embeddings.encode(sorted_texts, self.batch_size)
+        else:
+            sorted_embeddings = self.embeddings.client.encode(
+                sorted_texts,
+                batch_size=self.batch_size,
+                convert_to_numpy=True,
+                normalize_embeddings=True,
+                show_progress_bar=True
+            ).astype(np.float32, copy=False)
+        
+        # Scatter back to the original order
+        embeddings = np.empty_like(sorted_embeddings)
+        embeddings[order] = sorted_embeddings
+        return embeddings
+    
+    def _gpu_index_enabled(self) -> bool:
+        """
+        Check whether the index should be placed on a GPU.
+        
+        Returns:
+            True if requested and a GPU-enabled FAISS build sees a device
+        """
+        return (
+            self.use_gpu_index
+            and hasattr(faiss, "StandardGpuResources")
+            and faiss.get_num_gpus() > 0
+        )
+    
+    def _index_to_gpu(self, index: faiss.Index) -> faiss.Index:
+        """
+        Copy an index to the first GPU.
+        
+        Args:
+            index: CPU index
+            
+        Returns:
+            GPU index, or the CPU index if its type has no GPU implementation
+        """
+        if self._gpu_resources is None:
+            self._gpu_resources = faiss.StandardGpuResources()
+        
+        try:
+            return faiss.index_cpu_to_gpu(self._gpu_resources, 0, index)
+        except RuntimeError as e:
+            logger.warning(f"Index type not supported on GPU, keeping it on CPU: {e}")
+            return index
+    
+    @staticmethod
+    def _deduplicate(
+        embeddings: np.ndarray,
+        threshold: float,
+        block_size: int = 1024
+    ) -> Tuple[List[int], Dict[int, List[int]]]:
+        """
+        Find near-duplicate embeddings.
+        
+        Each vector is compared with the vectors kept so far and folded into
+        the most similar one if their cosine similarity exceeds the threshold.
+        Vectors are processed in blocks to amortize the FAISS call overhead.
+        
+        Args:
+            embeddings: Array of shape (n, dim)
+            threshold: Cosine similarity above which a vector is a duplicate
+            block_size: Number of vectors searched per FAISS call
+            
+        Returns:
+            Tuple of (indices of kept vectors, mapping from kept index to the
+            indices folded into it)
+        """
+        vectors = np.array(embeddings, dtype=np.float32)
+        faiss.normalize_L2(vectors)
+        index = faiss.IndexFlatIP(vectors.shape[1])
+        keep = []
+        folded = {}
+        
+        for start in range(0, len(vectors), block_size):
+            block = vectors[start:start + block_size]
+            if index.ntotal:
+                scores, ids = index.search(block, 1)
+            
+            # Vectors kept earlier in this block are not in the index yet
+            block_keep = []
+            for j, vector in enumerate(block):
+                best_score, best = -1.0, -1
+                if index.ntotal:
+                    best_score, best = scores[j, 0], keep[ids[j, 0]]
+                if block_keep:
+                    sims = vectors[block_keep] @ vector
+                    m = int(np.argmax(sims))
+                    if sims[m] > best_score:
+                        best_score, best = sims[m], block_keep[m]
+                
+                if best_score > threshold:
+                    folded.setdefault(best, []).append(start + j)
+                else:
+                    block_keep.append(start + j)
+            
+            keep.extend(block_keep)
+            if block_keep:
+                index.add(vectors[block_keep])
+        
+        return keep, folded
+    
+    @staticmethod
+    def _doc_sources(doc: Document) -> List[str]:
+        """
+        Get the sources of a chunk, including those of folded duplicates.
+        
+        Args:
+            doc: Retrieved document
+            
+        Returns:
+            List of source identifiers
+        """
+        sources = [doc.metadata.get("source", "unknown")]
+        sources.extend(dup["source"] for dup in doc.metadata.get("duplicates", []))
+        return sources
+    
+    def _build_index(self, embeddings: np.ndarray) -> faiss.Index:
+        """
+        Build an inner-product HNSW index over 8-bit scalar-quantized vectors.
+        
+        SQ8 stores each vector in a quarter of the FP32 footprint; ARM builds
+        use fp16 codes instead, which have a native NEON path in FAISS.
+        Vectors are L2-normalized, so scores are cosine similarities.
+        
+        FAISS has no GPU HNSW, so when the GPU index is enabled an exact flat
+        inner-product index is built on the GPU instead.
+        
+        Args:
+            embeddings: Array of shape (n, dim)
+            
+        Returns:
+            Trained and populated FAISS index
+        """
+        embeddings = np.array(embeddings, dtype=np.float32)
+        faiss.normalize_L2(embeddings)
+        dim = embeddings.shape[1]
+        
+        if self._gpu_index_enabled():
+            index = faiss.IndexFlatIP(dim)
+            index.add(embeddings)
+            return self._index_to_gpu(index)
         
-        logger.info(f"Added {len(chunks)} chunks from {source}")
+        if platform.machine().lower() in ("arm64", "aarch64"):
+            qtype = faiss.ScalarQuantizer.QT_fp16
+        else:
+            qtype = faiss.ScalarQuantizer.QT_8bit
+        
+        index = faiss.IndexHNSWSQ(
+            dim, qtype, self.hnsw_m, faiss.METRIC_INNER_PRODUCT
+        )
+        index.hnsw.efConstruction = self.ef_construction
+        index.train(embeddings)
+        index.add(embeddings)
+        return index
     
     def build_vector_database(self) -> None:
         """
         Build vector database from processed documents.
         """
-        if not self.documents:
+        if not self._contents:
             logger.warning("No documents processed. Vector database not built.")
             return
         
-        logger.info(f"Building vector database with {len(self.documents)} chunks")
+        logger.info(f"Building vector database with {len(self._contents)} chunks")
         
         try:
             # Extract text and metadata
-            texts = [doc["content"] for doc in self.documents]
-            metadatas = [doc["metadata"] for doc in self.documents]
+            texts = self._contents
+            metadatas = self._chunk_metadatas()
+            
+            # Compute embeddings in length-sorted batches
+            embeddings = self._embed_texts(texts)
+            
+            # Fold near-duplicate chunks into the first occurrence
+            if self.dedup_threshold is not None:
+                keep, folded = self._deduplicate(embeddings, self.dedup_threshold)
+                for kept, duplicates in folded.items():
+                    metadatas[kept]["duplicates"] = [
+                        {"source": metadatas[i]["source"], "chunk": metadatas[i]["chunk"]}
+                        for i in duplicates
+                    ]
+                texts = [texts[i] for i in keep]
+                metadatas = [metadatas[i] for i in keep]
+                embeddings = embeddings[keep]
+                logger.info(f"Dropped {len(self._contents) - len(keep)} near-duplicate chunks")
+            
+            # Build quantized HNSW index
+            index = self._build_index(embeddings)
             
             # Create vector database
-            self.vectordb = FAISS.from_texts(
-                texts=texts,
-                embedding=self.embeddings,
-                metadatas=metadatas
+            ids = [str(uuid.uuid4()) for _ in texts]
+            self.vectordb = FAISS(
+                embedding_function=self.embeddings,
+                index=index,
+                docstore=InMemoryDocstore({
+                    doc_id: Document(page_content=text, metadata=metadata)
+                    for doc_id, text, metadata in zip(ids, texts, metadatas)
+                }),
+                index_to_docstore_id=dict(enumerate(ids)),
+                distance_strategy=DistanceStrategy.MAX_INNER_PRODUCT
             )
             
+            # Cached answers refer to the previous database
+            self.answer_cache.clear()
+            
             # Save vector database if path is provided
             if self.vector_db_path:
                 self.save_vector_database(self.vector_db_path)
@@ -226,13 +1241,28 @@ class ResearchAgent:
             return
         
         os.makedirs(path, exist_ok=True)
-        self.vectordb.save_local(path)
+        
+        # GPU indexes must be copied back to CPU to be serialized
+        index = self.vectordb.index
+        if self._gpu_resources is not None and isinstance(index, faiss.GpuIndex):
+            self.vectordb.index = faiss.index_gpu_to_cpu(index)
+        try:
+            self.vectordb.save_local(path)
+        finally:
+            self.vectordb.index = index
         logger.info(f"Vector database saved to: {path}")
     
     def load_vector_database(self, path: str) -> None:
         """
         Load vector database from disk.
         
+        The FAISS index's vector codes are memory-mapped read-only, so they
+        are paged in on demand instead of being copied into RAM up front.
+        This needs FAISS >= 1.8 (IO_FLAG_MMAP_IFC); older versions fall back
+        to IO_FLAG_MMAP, which loads HNSW and flat indexes fully. Only
+        inner-product indexes are supported; databases saved with an L2
+        index must be rebuilt.
+        
         Args:
             path: Directory path to load vector database from
         """
@@ -240,23 +1270,115 @@ class ResearchAgent:
             logger.error(f"Vector database path not found: {path}")
             raise FileNotFoundError(f"Vector database path not found: {path}")
         
-        self.vectordb = FAISS.load_local(path, self.embeddings)
+        # IO_FLAG_MMAP only maps IVF lists; MMAP_IFC also maps flat codes,
+        # which covers both the HNSW+SQ and flat indexes built here
+        mmap_flag = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP)
+        index = faiss.read_index(
+            os.path.join(path, "index.faiss"),
+            mmap_flag | faiss.IO_FLAG_READ_ONLY
+        )
+        
+        # Retrieval ranks by cosine similarity; L2 distances would be misranked
+        if index.metric_type != faiss.METRIC_INNER_PRODUCT:
+            logger.error(f"Vector database does not use inner-product search: {path}")
+            raise ValueError(
+                f"Vector database at {path} uses an L2 index, which is no longer "
+                "supported. Rebuild the database with build_vector_database()."
+            )
+        
+        if self._gpu_index_enabled():
+            index = self._index_to_gpu(index)
+        
+        with open(os.path.join(path, "index.pkl"), "rb") as f:
+            docstore, index_to_docstore_id = pickle.load(f)
+        
+        self.vectordb = FAISS(
+            embedding_function=self.embeddings,
+            index=index,
+            docstore=docstore,
+            index_to_docstore_id=index_to_docstore_id,
+            distance_strategy=DistanceStrategy.MAX_INNER_PRODUCT
+        )
         self.vector_db_path = path
+        self.answer_cache.clear()
         logger.info(f"Vector database loaded from: {path}")
     
+    def _search_by_vectors(
+        self,
+        query_embeddings: np.ndarray,
+        similarity_threshold: float,
+        max_docs: int,
+        ef_search: int
+    ) -> List[List[Tuple[Document, float]]]:
+        """
+        Retrieve relevant chunks for a batch of query embeddings.
+        
+        The similarity threshold is applied inside FAISS with a range search,
+        so only matching hits reach Python; they are then capped to the
+        `max_docs` best. Index types without range search support fall back
+        to a top-k search filtered by threshold.
+        
+        Args:
+            query_embeddings: Array of shape (num_queries, dim)
+            similarity_threshold: Minimum cosine similarity of retrieved chunks
+            max_docs: Maximum number of documents to retrieve per query
+            ef_search: HNSW search breadth
+            
+        Returns:
+            List of (document, score) lists, one per query, best first
+        """
+        queries = np.array(query_embeddings, dtype=np.float32)
+        faiss.normalize_L2(queries)
+        
+        if hasattr(self.vectordb.index, "hnsw"):
+            self.vectordb.index.hnsw.efSearch = max(ef_search, max_docs)
+        
+        try:
+            # Range search keeps hits with score > radius
+            radius = np.nextafter(np.float32(similarity_threshold), np.float32(-np.inf))
+            lims, scores, ids = self.vectordb.index.range_search(queries, float(radius))
+            hits = [
+                (scores[lims[q]:lims[q + 1]], ids[lims[q]:lims[q + 1]])
+                for q in range(len(queries))
+            ]
+        except RuntimeError:
+            scores, ids = self.vectordb.index.search(queries, max_docs)
+            keep = (ids >= 0) & (scores >= similarity_threshold)
+            hits = [(s[k], i[k]) for s, i, k in zip(scores, ids, keep)]
+        
+        results = []
+        for row_scores, row_ids in hits:
+            # Keep the max_docs best hits, best first
+            if len(row_scores) > max_docs:
+                top = np.argpartition(-row_scores, max_docs - 1)[:max_docs]
+                row_scores, row_ids = row_scores[top], row_ids[top]
+            order = np.argsort(-row_scores, kind="stable")
+            
+            docs = []
+            for score, idx in zip(row_scores[order], row_ids[order]):
+                doc_id = self.vectordb.index_to_docstore_id[int(idx)]
+                docs.append((self.vectordb.docstore.search(doc_id), float(score)))
+            results.append(docs)
+        return results
+    
     def answer_question(
         self, 
         question: str, 
-        similarity_threshold: float = 0.7,
-        max_docs: int = 5
+        similarity_threshold: float = 0.65,
+        max_docs: int = 5,
+        ef_search: int = 64
     ) -> Dict[str, Any]:
         """
         Answer a question based on the document content.
         
+        Answers served from the semantic cache are added to conversation
+        memory directly, since the QA chain is not run for them.
+        
         Args:
             question: The question to answer
-            similarity_threshold: Threshold for similarity score
+            similarity_threshold: Minimum cosine similarity of retrieved chunks
             max_docs: Maximum number of documents to retrieve
+            ef_search: HNSW search breadth; raise it until recall stops improving
             
         Returns:
             Dictionary containing answer and metadata
@@ -267,20 +1389,31 @@ class ResearchAgent:
         
         logger.info(f"Answering question: {question}")
         
-        # Retrieve relevant documents
-        docs = self.vectordb.similarity_search_with_score(
-            question, 
-            k=max_docs
-        )
+        question_embedding = self._embed_query(question)
+        params = (similarity_threshold, max_docs, ef_search)
+        
+        # Serve near-duplicate questions from the answer cache
+        cached = self.answer_cache.lookup(question_embedding, params)
+        if cached is not None:
+            logger.info("Answered from semantic cache")
+            self.memory.chat_memory.add_user_message(question)
+            self.memory.chat_memory.add_ai_message(cached["answer"])
+            return dict(cached)
+        
+        # Retrieve documents above the similarity threshold
+        docs = self._search_by_vectors(
+            np.array([question_embedding]),
+            similarity_threshold,
+            max_docs,
+            ef_search
+        )[0]
         
-        # Filter by similarity threshold
         relevant_docs = []
         sources = set()
         
         for doc, score in docs:
-            if score <= similarity_threshold:
-                relevant_docs.append(doc)
-                sources.add(doc.metadata.get("source", "unknown"))
+            relevant_docs.append(doc)
+            sources.update(self._doc_sources(doc))
         
         if not relevant_docs:
             logger.warning("No relevant documents found for the question")
@@ -299,7 +1432,7 @@ class ResearchAgent:
         
         logger.info(f"Generated answer with {len(relevant_docs)} relevant chunks")
         
-        return {
+        result = {
             "answer": answer,
             "sources": list(sources),
             "num_relevant_chunks": len(relevant_docs),
@@ -307,6 +1440,127 @@ class ResearchAgent:
             "prompt_tokens": cb.prompt_tokens,
             "completion_tokens": cb.completion_tokens
         }
+        self.answer_cache.add(question_embedding, question, params, result)
+        
+        return result
+    
+    def answer_questions(
+        self,
+        questions: List[str],
+        similarity_threshold: float = 0.65,
+        max_docs: int = 5,
+        ef_search: int = 64,
+        max_concurrency: int = 8
+    ) -> List[Dict[str, Any]]:
+        """
+        Answer several questions with batched retrieval and concurrent LLM calls.
+        
+        Questions are embedded in one batch and searched in one FAISS call.
+        The prompts are then sent to the language model from a thread pool,
+        one request per question, so up to `max_concurrency` requests are in
+        flight at once instead of running back to back. Unlike answer_question, batched answers are not added
+        to conversation memory.
+        
+        Args:
+            questions: The questions to answer
+            similarity_threshold: Minimum cosine similarity of retrieved chunks
+            max_docs: Maximum number of documents to retrieve per question
+            ef_search: HNSW search breadth; raise it until recall stops improving
+            max_concurrency: Maximum number of LLM requests in flight at once
+            
+        Returns:
+            List of dictionaries containing answer and metadata, in input order
+        """
+        if not self.vectordb:
+            logger.error("Vector database not built. Process documents first.")
+            raise ValueError("Vector database not built. Process documents first.")
+        
+        if max_concurrency < 1:
+            logger.error(f"Invalid max_concurrency: {max_concurrency}")
+            raise ValueError(f"max_concurrency must be at least 1, got {max_concurrency}")
+        
+        if not questions:
+            return []
+        
+        logger.info(f"Answering {len(questions)} questions")
+        
+        question_embeddings = np.asarray(
+            self.embeddings.embed_documents(questions), dtype=np.float32
+        )
+        results = [None] * len(questions)
+        params = (similarity_threshold, max_docs, ef_search)
+        
+        # Serve near-duplicate questions from the answer cache
+        pending = []
+        for i, embedding in enumerate(question_embeddings):
+            cached = self.answer_cache.lookup(embedding, params)
+            if cached is not None:
+                results[i] = dict(cached)
+            else:
+                pending.append(i)
+        
+        if not pending:
+            return results
+        
+        # Retrieve relevant documents for all pending questions at once
+        retrieved = self._search_by_vectors(
+            question_embeddings[pending],
+            similarity_threshold,
+            max_docs,
+            ef_search
+        )
+        
+        prompts = []
+        answered = []
+        prompt = self.chain.llm_chain.prompt
+        for i, docs in zip(pending, retrieved):
+            if not docs:
+                results[i] = {
+                    "answer": "I couldn't find relevant information to answer this question.",
+                    "sources": [],
+                    "confidence": 0.0
+                }
+                continue
+            
+            context = "\n\n".join(doc.page_content for doc, _ in docs)
+            prompts.append(prompt.format(**{
+                self.chain.document_variable_name: context,
+                "question": questions[i]
+            }))
+            answered.append((i, docs))
+        
+        if not prompts:
+            logger.warning("No relevant documents found for any question")
+            return results
+        
+        # Get answers from language model concurrently, tracking tokens per
+        # prompt. LLM.batch would run the prompts one after another, since
+        # LLM._generate loops over them, so the calls are dispatched here.
+        callbacks = [OpenAICallbackHandler() for _ in prompts]
+        with ThreadPoolExecutor(max_workers=min(max_concurrency, len(prompts))) as executor:
+            answers = list(executor.map(
+                lambda prompt, cb: self.llm.invoke(prompt, config={"callbacks": [cb]}),
+                prompts,
+                callbacks
+            ))
+        
+        for (i, docs), answer, cb in zip(answered, answers, callbacks):
+            result = {
+                "answer": answer,
+                "sources": list({
+                    source for doc, _ in docs for source in self._doc_sources(doc)
+                }),
+                "num_relevant_chunks": len(docs),
+                "total_tokens": cb.total_tokens,
+                "prompt_tokens": cb.prompt_tokens,
+                "completion_tokens": cb.completion_tokens
+            }
+            self.answer_cache.add(question_embeddings[i], questions[i], params, result)
+            results[i] = result
+        
+        logger.info(f"Generated {len(prompts)} answers")
+        
+        return results
     
     def clear_memory(self) -> None:
         """